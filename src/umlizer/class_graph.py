@@ -1,30 +1,75 @@
 """Create graphviz for classes."""
 from __future__ import annotations
 
-import copy
-import dataclasses
-import glob
+import functools
 import importlib.util
-import inspect
 import os
+import re
 import sys
 import types
 
 from pathlib import Path
-from typing import Any, Type, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    NoReturn,
+    TypeVar,
+    Union,
+    cast,
+)
 
-import graphviz as gv
-import typer
+from umlizer import __version__
 
+if TYPE_CHECKING:
+    import graphviz as gv
 
-def raise_error(message: str, exit_code: int = 1) -> None:
+_MIN_MODULES_FOR_WORKERS = 4
+_T = TypeVar('_T')
+# same pattern graphviz.quoting uses to escape quotes in DOT strings
+_UNESCAPED_QUOTE = re.compile(r'(?P<bs>(?:\\\\)*)\\?(?P<q>")')
+
+
+def raise_error(message: str, exit_code: int = 1) -> NoReturn:
     """Raise an error using typer."""
+    import typer
+
     red_text = typer.style(message, fg=typer.colors.RED, bold=True)
     typer.echo(red_text, err=True, color=True)
     raise typer.Exit(exit_code)
 
 
-def _get_fullname(entity: Type[Any]) -> str:
+def _cache_by_class(func: Callable[[type], _T]) -> Callable[[type], _T]:
+    """
+    Memoize a function of a class, bypassing the cache for unhashable ones.
+
+    Parameters
+    ----------
+    func : Callable
+        The function to be memoized; it receives a class.
+
+    Returns
+    -------
+    Callable
+        The memoized function.
+    """
+    cached_func = functools.lru_cache(maxsize=None)(func)
+
+    @functools.wraps(func)
+    def wrapper(klass: type) -> _T:
+        # a metaclass may define __eq__ without __hash__
+        try:
+            hash(klass)
+        except TypeError:
+            return func(klass)
+        return cached_func(klass)
+
+    return wrapper
+
+
+@_cache_by_class
+def _get_fullname(entity: type) -> str:
     """
     Get the fully qualified name of a given entity.
 
@@ -38,10 +83,10 @@ def _get_fullname(entity: Type[Any]) -> str:
     str
         Fully qualified name of the entity.
     """
-    return f'{entity.__module__}.{entity.__name__}'
+    return sys.intern(f'{entity.__module__}.{entity.__name__}')
 
 
-def _get_methods(entity: Type[Any]) -> list[str]:
+def _get_methods(entity: type) -> list[str]:
     """
     Return a list of methods of a given entity.
 
@@ -58,61 +103,60 @@ def _get_methods(entity: Type[Any]) -> list[str]:
     return [
         k
         for k, v in entity.__dict__.items()
-        if not k.startswith('__') and isinstance(v, types.FunctionType)
+        if not k.startswith('__') and type(v) is types.FunctionType
     ]
 
 
 def _get_dataclass_structure(
-    klass: Type[Any],
+    klass: type,
 ) -> dict[str, Union[dict[str, str], list[str]]]:
-    fields = {
-        k: v.type.__name__ for k, v in klass.__dataclass_fields__.items()
-    }
+    dataclass_fields = getattr(klass, '__dataclass_fields__')
+    fields = {k: v.type.__name__ for k, v in dataclass_fields.items()}
     return {'fields': fields, 'methods': _get_methods(klass)}
 
 
-def _get_base_classes(klass: Type[Any]) -> list[Type[Any]]:
-    return [
-        c
-        for c in klass.__mro__
-        if c.__name__ not in ('object', klass.__name__)
-    ]
-
-
-def _get_annotations(klass: Type[Any]) -> dict[str, Any]:
-    return getattr(klass, '__annotations__', {})
+@_cache_by_class
+def _get_base_classes(klass: type) -> tuple[type, ...]:
+    return tuple(
+        c for c in klass.__mro__ if c is not klass and c is not object
+    )
 
 
 def _get_classicclass_structure(
-    klass: Type[Any],
+    klass: type,
 ) -> dict[str, Union[dict[str, str], list[str]]]:
-    _methods = _get_methods(klass)
+    annotations = getattr(klass, '__annotations__', {})
+    methods = []
     fields = {}
 
-    for k in list(klass.__dict__.keys()):
-        if k.startswith('__') or k in _methods:
+    # methods and fields are split in the same pass over the class dict
+    for k, v in klass.__dict__.items():
+        if k.startswith('__'):
             continue
-        value = _get_annotations(klass).get(k, '')
+        if type(v) is types.FunctionType:
+            methods.append(k)
+            continue
+        value = annotations.get(k, '')
         fields[k] = getattr(value, '__value__', str(value))
 
     return {
         'fields': fields,
-        'methods': _methods,
+        'methods': methods,
     }
 
 
 def _get_class_structure(
-    klass: Type[Any],
+    klass: type,
 ) -> dict[str, Union[dict[str, str], list[str]]]:
-    if dataclasses.is_dataclass(klass):
+    if hasattr(klass, '__dataclass_fields__'):
         return _get_dataclass_structure(klass)
-    elif inspect.isclass(klass):
+    elif isinstance(klass, type):
         return _get_classicclass_structure(klass)
 
     raise Exception('The given class is not actually a class.')
 
 
-def _get_entity_class_uml(entity: Type[Any]) -> str:
+def _get_entity_class_uml(entity: type) -> str:
     """
     Generate the UML node representation for a given class entity.
 
@@ -136,31 +180,27 @@ def _get_entity_class_uml(entity: Type[Any]) -> str:
     if base_classes:
         class_name += f' ({base_classes})'
 
-    # Formatting fields and methods
+    # Formatting fields and methods, one `\l`-terminated row per member
     fields_struct = cast(dict[str, str], class_structure['fields'])
     fields = (
-        '\\l'.join(
+        ''.join(
             [
-                f'{"-" if k.startswith("_") else "+"} {k}: {v}'
+                f'{"-" if k[0] == "_" else "+"} {k}: {v}\\l'
                 for k, v in fields_struct.items()
             ]
         )
-        + '\\l'
+        or '\\l'
     )
     methods_struct = cast(list[str], class_structure['methods'])
     methods = (
-        '\\l'.join(
-            [
-                f'{"-" if m.startswith("_") else "+"} {m}()'
-                for m in methods_struct
-            ]
+        ''.join(
+            [f'{"-" if m[0] == "_" else "+"} {m}()\\l' for m in methods_struct]
         )
-        + '\\l'
+        or '\\l'
     )
 
     # Combine class name, fields, and methods into the UML node format
-    uml_representation = '{' + f'{class_name}|{fields}|{methods}' + '}'
-    return uml_representation
+    return f'{{{class_name}|{fields}|{methods}}}'
 
 
 def _search_modules(
@@ -174,22 +214,31 @@ def _search_modules(
     target : str
         Target directory to search for modules.
     exclude_pattern : list, optional
-        Patterns to exclude from the search, by default ['__pycache__'].
+        File or directory names to exclude from the search, by default
+        ['__pycache__'].
 
     Returns
     -------
     list
         A list of module file paths.
     """
+    excluded = frozenset(exclude_pattern)
     results = []
-    for f in glob.glob('{}/**/*'.format(target), recursive=True):
-        skip = False
-        for x in exclude_pattern:
-            if x in f:
-                skip = True
-                break
-        if not skip and f.endswith('.py'):
-            results.append(f)
+    dirs = [target]
+    while dirs:
+        # unreadable directories are skipped, as glob did before
+        try:
+            with os.scandir(dirs.pop()) as entries:
+                for entry in entries:
+                    # hidden entries are skipped, as glob did before
+                    if entry.name in excluded or entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.name.endswith('.py'):
+                        results.append(entry.path)
+        except OSError:
+            continue
 
     return results
 
@@ -212,19 +261,59 @@ def _extract_module_name(module_path: str) -> tuple[str, str]:
     tuple[str, str]
         Returns the module path and the module name.
     """
-    # Extract the module name from the path.
-    # This needs to be adapted depending on your project's structure.
-    # Example: 'path/to/module.py' -> 'path.to.module'
-    module_split = module_path.split(os.sep)
-    module_path = os.sep.join(module_split[:-1])
-    module_filename = module_split[-1]
-    module_name = module_filename.rstrip('.py')
+    # Example: 'path/to/module.py' -> ('path/to', 'module')
+    module_path, module_filename = os.path.split(module_path)
+    module_name = os.path.splitext(module_filename)[0]
     return module_path, module_name
 
 
-def _get_classes_from_module(module_path: str) -> list[Type[Any]]:
+@functools.lru_cache(maxsize=None)
+def _import_module(module_path: str, module_name: str) -> types.ModuleType:
     """
-    Extract classes from a given module path using importlib.import_module.
+    Import a module from a given directory, reusing already loaded modules.
+
+    Parameters
+    ----------
+    module_path : str
+        The directory that contains the module.
+    module_name : str
+        The name of the module to be imported.
+
+    Returns
+    -------
+    types.ModuleType
+        The imported module.
+    """
+    modules = sys.modules
+    if module_name in modules:
+        return modules[module_name]
+
+    # the module file is already known, so the sys.path finders are skipped
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(module_path, f'{module_name}.py')
+    )
+    if spec is None or spec.loader is None:
+        raise ImportError(f'Cannot load module {module_name}.')
+    module = importlib.util.module_from_spec(spec)
+
+    # the module directory is put on sys.path so the module can import
+    # its sibling modules
+    original_path = list(sys.path)
+    sys.modules[module_name] = module
+    try:
+        sys.path.insert(0, module_path)
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    finally:
+        sys.path = original_path
+    return module
+
+
+def _get_classes_from_module(module_path: str) -> list[type]:
+    """
+    Extract classes from a given module path.
 
     Parameters
     ----------
@@ -236,62 +325,299 @@ def _get_classes_from_module(module_path: str) -> list[Type[Any]]:
     list
         A list of class objects.
     """
-    module_path, module_name = _extract_module_name(module_path)
-    original_path = copy.deepcopy(sys.path)
+    module_dir, module_name = _extract_module_name(module_path)
     try:
-        sys.path.insert(0, module_path)
-        module = importlib.import_module(module_name)
-        sys.path = original_path
+        # empty files, like most `__init__.py`, cannot define any class
+        if os.path.getsize(module_path) == 0:
+            return []
+
+        module = _import_module(module_dir, module_name)
+        # classes imported from other modules are skipped, they are
+        # collected from the module that defines them
         classes_list = [
-            getattr(module, o)
-            for o in dir(module)
-            if inspect.isclass(getattr(module, o)) and not o.startswith('__')
+            v
+            for k, v in vars(module).items()
+            if isinstance(v, type)
+            and not k.startswith('__')
+            and v.__module__ == module.__name__
         ]
         return classes_list
     except KeyboardInterrupt:
         raise_error('KeyboardInterrupt', 1)
     except Exception as e:
-        print(f' Error loading module {module_name} '.center(80, '='))
-        print(e)
-        print('.' * 80)
+        title = f' Error loading module {module_name} '.center(80, '=')
+        sys.stderr.write(f'{title}\n{e}\n{"." * 80}\n')
         return []
-    return classes_list
+
+
+def _quote(value: str) -> str:
+    """Return the value as a DOT double-quoted string."""
+    return '"' + _UNESCAPED_QUOTE.sub(r'\g<bs>\\\g<q>', value) + '"'
+
+
+def _get_class_node(klass: type) -> tuple[str, str, list[str]]:
+    """
+    Return the graph node data for a given class.
+
+    Parameters
+    ----------
+    klass : type
+        The class to be represented in the graph.
+
+    Returns
+    -------
+    tuple[str, str, list[str]]
+        The class full name, its UML label and the full names of its base
+        classes.
+    """
+    return (
+        _get_fullname(klass),
+        _get_entity_class_uml(klass),
+        [_get_fullname(b) for b in _get_base_classes(klass)],
+    )
+
+
+def _init_worker(source_path: str) -> None:
+    """Prepare the `sys.path` of a worker process that loads modules."""
+    sys.path.insert(0, source_path)
+
+
+def _get_class_nodes_from_module(
+    module_path: str,
+) -> list[tuple[str, str, list[str]]]:
+    """
+    Load a module and return the graph node data for its classes.
+
+    Only plain strings are returned, so the result can be sent back from a
+    worker process without importing the module again in the parent.
+
+    Parameters
+    ----------
+    module_path : str
+        The path to the module from which classes are to be extracted.
+
+    Returns
+    -------
+    list
+        A list of graph node data, one per class.
+    """
+    return [_get_class_node(c) for c in _get_classes_from_module(module_path)]
+
+
+def _get_cache_dir() -> Path:
+    """Return the directory where the class graph node data is cached."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return Path(cache_home) / 'umlizer'
+
+
+def _get_source_mtimes(classes: list[type]) -> dict[str, float]:
+    """
+    Return the modification time of the files that define the given classes.
+
+    Every class in the MRO of each given class is included, because the
+    UML label and the bases of a class depend on all of them.
+
+    Parameters
+    ----------
+    classes : list
+        The classes whose source files are required.
+
+    Returns
+    -------
+    dict[str, float]
+        The modification time of each source file, by its absolute path.
+    """
+    mtimes = {}
+    for klass in classes:
+        for c in klass.__mro__:
+            module = sys.modules.get(c.__module__)
+            module_file = getattr(module, '__file__', None)
+            if module_file:
+                module_file = os.path.abspath(module_file)
+                mtimes[module_file] = os.path.getmtime(module_file)
+    return mtimes
+
+
+def _get_cached_class_nodes_from_module(
+    module_path: str,
+) -> list[tuple[str, str, list[str]]]:
+    """
+    Return the graph node data for a module, using the on-disk cache.
+
+    The cache entry of a module is valid while the umlizer version and the
+    modification time of every file that defines a class in the MRO of its
+    classes are the same as when the entry was written.
+
+    Parameters
+    ----------
+    module_path : str
+        The path to the module from which classes are to be extracted.
+
+    Returns
+    -------
+    list
+        A list of graph node data, one per class.
+    """
+    import hashlib
+    import json
+
+    module_path = os.path.abspath(module_path)
+    key = hashlib.sha256(module_path.encode('utf-8')).hexdigest()
+    cache_path = _get_cache_dir() / f'{key}.json'
+
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+        # a missing source file raises OSError, which invalidates the entry
+        if cached['version'] == __version__ and all(
+            os.path.getmtime(path) == mtime
+            for path, mtime in cached['mtimes'].items()
+        ):
+            return [
+                (fullname, label, bases)
+                for fullname, label, bases in cached['nodes']
+            ]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    try:
+        mtime = os.path.getmtime(module_path)
+    except OSError:
+        # the loader reports the unreadable module and skips it
+        return _get_class_nodes_from_module(module_path)
+    classes = _get_classes_from_module(module_path)
+    class_nodes = [_get_class_node(c) for c in classes]
+
+    # an empty result may come from a module that failed to load, so it is
+    # not cached and the module is loaded again in the next run
+    if class_nodes:
+        try:
+            mtimes = _get_source_mtimes(classes)
+            mtimes[module_path] = mtime
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {
+                        'version': __version__,
+                        'mtimes': mtimes,
+                        'nodes': class_nodes,
+                    },
+                    f,
+                )
+        except OSError:
+            pass
+
+    return class_nodes
+
+
+def _create_diagram(
+    class_nodes: Iterable[tuple[str, str, list[str]]],
+    verbose: bool = False,
+) -> gv.Digraph:
+    """Create a diagram for a sequence of class graph node data."""
+    import graphviz as gv
+
+    # DOT lines are assembled here and handed over in one go, instead of
+    # paying the graphviz wrapper overhead for every node and edge
+    body = []
+    edges: set[tuple[str, str]] = set()
+    for fullname, label, bases in class_nodes:
+        body.append(f'\t{_quote(fullname)} [label={_quote(label)}]\n')
+
+        for b in bases:
+            edges.add((b, fullname))
+
+        if verbose:
+            print('[II]', fullname, '- included.')
+
+    body.extend(f'\t{_quote(t)} -> {_quote(h)}\n' for t, h in edges)
+
+    return gv.Digraph(
+        comment='Graph',
+        node_attr={'shape': 'record', 'rankdir': 'BT'},
+        body=body,
+    )
 
 
 def create_class_diagram(
-    classes_list: list[Type[Any]],
+    classes_list: list[type],
     verbose: bool = False,
 ) -> gv.Digraph:
     """Create a diagram for a list of classes."""
-    g = gv.Digraph(comment='Graph')
-    g.attr('node', shape='record', rankdir='BT')
+    return _create_diagram(
+        (_get_class_node(c) for c in classes_list), verbose=verbose
+    )
 
-    edges = []
-    for c in classes_list:
-        g.node(_get_fullname(c), _get_entity_class_uml(c))
 
-        for b in _get_base_classes(c):
-            edges.append((_get_fullname(b), _get_fullname(c)))
+def _iter_class_nodes(
+    path_str: str,
+    get_class_nodes: Callable[[str], list[tuple[str, str, list[str]]]],
+) -> Iterator[tuple[str, str, list[str]]]:
+    """
+    Yield the graph node data of the classes found in a source path.
 
-        if verbose:
-            print('[II]', _get_fullname(c), '- included.')
+    Node data is yielded as soon as each module is loaded, so the diagram
+    is assembled while the remaining modules are still being loaded.
+
+    Parameters
+    ----------
+    path_str : str
+        The path to a module or to a directory with modules.
+    get_class_nodes : Callable
+        The function that returns the graph node data of a module.
+
+    Yields
+    ------
+    tuple[str, str, list[str]]
+        The full name, the label and the base class names of a class.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not os.path.isdir(path_str):
+        yield from get_class_nodes(path_str)
+        return
+
+    module_files = _search_modules(path_str)
 
-    g.edges(set(edges))
-    return g
+    # starting the worker processes costs more than it saves when
+    # there are only a few modules to load
+    if len(module_files) < _MIN_MODULES_FOR_WORKERS:
+        original_path = list(sys.path)
+        try:
+            sys.path.insert(0, path_str)
+            for f in module_files:
+                yield from get_class_nodes(f)
+        finally:
+            sys.path = original_path
+        return
+
+    with ProcessPoolExecutor(
+        initializer=_init_worker, initargs=(path_str,)
+    ) as executor:
+        for nodes in executor.map(get_class_nodes, module_files, chunksize=8):
+            yield from nodes
 
 
 def create_class_diagram_from_source(
-    source: Path, verbose: bool = False
+    source: Path, verbose: bool = False, use_cache: bool = False
 ) -> gv.Digraph:
     """
     Create a class diagram from the source code located at the specified path.
 
+    When the source is a directory, its modules are loaded in parallel by a
+    pool of worker processes.
+
     Parameters
     ----------
     source : Path
         The path to the source code.
     verbose : bool, optional
         Flag to enable verbose logging, by default False.
+    use_cache : bool, optional
+        Flag to reuse the class data cached for modules that did not change
+        since the previous run, by default False.
 
     Returns
     -------
@@ -305,17 +631,16 @@ def create_class_diagram_from_source(
     ValueError
         If the provided path is not a directory.
     """
-    classes_list = []
+    get_class_nodes = (
+        _get_cached_class_nodes_from_module
+        if use_cache
+        else _get_class_nodes_from_module
+    )
 
-    path_str = str(source)
+    path_str = os.fspath(source)
 
     if not os.path.exists(path_str):
         raise_error(f'Path "{path_str}" doesn\'t  exist.', 1)
-    if os.path.isdir(path_str):
-        sys.path.insert(0, path_str)
-
-        for f in _search_modules(path_str):
-            classes_list.extend(_get_classes_from_module(f))
-    else:
-        classes_list.extend(_get_classes_from_module(path_str))
-    return create_class_diagram(classes_list, verbose=verbose)
+    return _create_diagram(
+        _iter_class_nodes(path_str, get_class_nodes), verbose=verbose
+    )
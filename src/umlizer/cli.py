@@ -10,7 +10,7 @@ import typer
 from typer import Context, Option
 from typing_extensions import Annotated
 
-from umlizer import __version__, class_graph
+from umlizer import __version__
 
 app = typer.Typer()
 
@@ -78,12 +78,22 @@ def class_(
     verbose: Annotated[
         bool, typer.Option(help='Active the verbose mode.')
     ] = False,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            help='Reuse the class data of modules unchanged since last run.'
+        ),
+    ] = False,
 ) -> None:
     """Run the command for class graph."""
+    from umlizer import class_graph
+
     source = make_absolute(source)
     target = make_absolute(target) / 'class_graph'
 
-    g = class_graph.create_class_diagram_from_source(source, verbose=verbose)
+    g = class_graph.create_class_diagram_from_source(
+        source, verbose=verbose, use_cache=cache
+    )
     g.format = 'png'
     g.render(target)
 
@@ -1,4 +1,5 @@
 """Main tests for umlizer."""
+import os
 
 
 def test_import() -> None:
@@ -6,3 +7,272 @@ def test_import() -> None:
     import umlizer
 
     assert umlizer
+
+
+def test_extract_module_name() -> None:
+    """Test that only the `.py` suffix is removed from the module name."""
+    from umlizer.class_graph import _extract_module_name
+
+    module_path, module_name = _extract_module_name(
+        os.path.join('src', 'pkg', 'apply.py')
+    )
+
+    assert module_path == os.path.join('src', 'pkg')
+    assert module_name == 'apply'
+
+
+def test_get_base_classes_with_same_name() -> None:
+    """Test that a base class named like its subclass is kept."""
+    from umlizer.class_graph import _get_base_classes
+
+    class Base:
+        pass
+
+    SameName = type('Base', (Base,), {})
+
+    assert _get_base_classes(SameName) == (Base,)
+
+
+def test_create_class_diagram_matches_graphviz_quoting() -> None:
+    """Test that the DOT source matches the graphviz node/edge output."""
+    import graphviz as gv
+
+    from umlizer.class_graph import (
+        _get_entity_class_uml,
+        _get_fullname,
+        create_class_diagram,
+    )
+
+    class Quoted:
+        value = 'a'
+        other = 'b'
+
+        def run(self) -> None:
+            pass
+
+    # annotations rendered with double quotes in the node label, one of
+    # them preceded by an escaped backslash
+    Quoted.__annotations__ = {
+        'value': 'Literal["a"]',
+        'other': 'Literal["\\\\"]',
+    }
+
+    class Child(Quoted):
+        pass
+
+    label = _get_entity_class_uml(Quoted)
+    assert '"' in label
+    assert '\\l' in label
+
+    expected = gv.Digraph(comment='Graph')
+    expected.attr('node', shape='record', rankdir='BT')
+    for klass in (Quoted, Child):
+        expected.node(_get_fullname(klass), _get_entity_class_uml(klass))
+    expected.edges([(_get_fullname(Quoted), _get_fullname(Child))])
+
+    assert create_class_diagram([Quoted, Child]).source == expected.source
+
+
+def test_create_class_diagram_from_source_with_workers(tmp_path) -> None:
+    """Test that a source tree is loaded through the worker pool."""
+    from umlizer.class_graph import (
+        _MIN_MODULES_FOR_WORKERS,
+        create_class_diagram_from_source,
+    )
+
+    modules = {
+        'pool_base.py': (
+            'import dataclasses\n\n\n'
+            '@dataclasses.dataclass\n'
+            'class PoolBase:\n'
+            '    name: str = ""\n'
+        ),
+        'pool_child.py': (
+            'from pool_base import PoolBase\n\n\n'
+            'class PoolChild(PoolBase):\n'
+            '    def run(self):\n'
+            '        pass\n'
+        ),
+        'pool_other.py': 'class PoolOther:\n    pass\n',
+        'pool_broken.py': 'raise RuntimeError("broken module")\n',
+    }
+    assert len(modules) >= _MIN_MODULES_FOR_WORKERS
+    for filename, content in modules.items():
+        (tmp_path / filename).write_text(content)
+
+    lines = create_class_diagram_from_source(tmp_path).source.splitlines()
+    # PoolBase is also bound in pool_child, but it is emitted only once, and
+    # pool_broken is skipped
+    nodes = sorted(line for line in lines if '[label=' in line)
+    edges = [line for line in lines if '->' in line]
+
+    assert nodes == [
+        '\t"pool_base.PoolBase" [label="{PoolBase|+ name: str\\l|\\l}"]',
+        '\t"pool_child.PoolChild" '
+        '[label="{PoolChild (pool_base.PoolBase)|+ name: str\\l|+ run()\\l}"]',
+        '\t"pool_other.PoolOther" [label="{PoolOther|\\l|\\l}"]',
+    ]
+    assert edges == ['\t"pool_base.PoolBase" -> "pool_child.PoolChild"']
+
+
+def test_create_class_diagram_from_source_restores_sys_path(tmp_path) -> None:
+    """Test that loading a small tree in-process leaves sys.path intact."""
+    import sys
+
+    from umlizer.class_graph import create_class_diagram_from_source
+
+    (tmp_path / 'path_base.py').write_text('class PathBase:\n    pass\n')
+    original_path = list(sys.path)
+
+    create_class_diagram_from_source(tmp_path)
+
+    assert sys.path == original_path
+
+
+def _write_cache_modules(tmp_path, prefix: str) -> str:
+    """Write a base module and a child module, return the child path."""
+    (tmp_path / f'{prefix}_base.py').write_text(
+        f'class {prefix.title()}Base:\n    pass\n'
+    )
+    child_path = tmp_path / f'{prefix}_child.py'
+    child_path.write_text(
+        f'from {prefix}_base import {prefix.title()}Base\n\n\n'
+        f'class {prefix.title()}Child({prefix.title()}Base):\n    pass\n'
+    )
+    return str(child_path)
+
+
+def _count_module_loads(monkeypatch) -> list:
+    """Record every module actually loaded by the cached loader."""
+    from umlizer import class_graph
+
+    loaded = []
+    get_classes_from_module = class_graph._get_classes_from_module
+
+    def _get_classes(module_path: str) -> list:
+        loaded.append(module_path)
+        return get_classes_from_module(module_path)
+
+    monkeypatch.setattr(class_graph, '_get_classes_from_module', _get_classes)
+    return loaded
+
+
+def test_class_nodes_cache_hit(tmp_path, monkeypatch) -> None:
+    """Test that an unchanged module is read from the cache."""
+    from umlizer.class_graph import _get_cached_class_nodes_from_module
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    loaded = _count_module_loads(monkeypatch)
+    child_path = _write_cache_modules(tmp_path, 'hit')
+
+    nodes = _get_cached_class_nodes_from_module(child_path)
+    cached_nodes = _get_cached_class_nodes_from_module(child_path)
+
+    assert cached_nodes == nodes
+    assert nodes[0][2] == ['hit_base.HitBase']
+    assert loaded == [child_path]
+
+
+def test_class_nodes_cache_miss_after_base_mtime_change(
+    tmp_path, monkeypatch
+) -> None:
+    """Test that changing a module in the MRO invalidates the cache."""
+    from umlizer.class_graph import _get_cached_class_nodes_from_module
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    loaded = _count_module_loads(monkeypatch)
+    child_path = _write_cache_modules(tmp_path, 'mtime')
+
+    _get_cached_class_nodes_from_module(child_path)
+    base_path = tmp_path / 'mtime_base.py'
+    mtime = os.path.getmtime(base_path) + 10
+    os.utime(base_path, (mtime, mtime))
+    _get_cached_class_nodes_from_module(child_path)
+
+    assert loaded == [child_path, child_path]
+
+
+def test_class_nodes_cache_miss_after_version_change(
+    tmp_path, monkeypatch
+) -> None:
+    """Test that a new umlizer version invalidates the cache."""
+    from umlizer import class_graph
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    loaded = _count_module_loads(monkeypatch)
+    child_path = _write_cache_modules(tmp_path, 'version')
+
+    class_graph._get_cached_class_nodes_from_module(child_path)
+    monkeypatch.setattr(class_graph, '__version__', '0.0.0-other')
+    class_graph._get_cached_class_nodes_from_module(child_path)
+
+    assert loaded == [child_path, child_path]
+
+
+def test_dangling_module_symlink_is_skipped(tmp_path, monkeypatch) -> None:
+    """Test that a module file that cannot be read is skipped."""
+    from umlizer.class_graph import (
+        _get_cached_class_nodes_from_module,
+        _get_classes_from_module,
+    )
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    module_path = tmp_path / 'dangling.py'
+    module_path.symlink_to(tmp_path / 'missing.py')
+
+    assert _get_classes_from_module(str(module_path)) == []
+    assert _get_cached_class_nodes_from_module(str(module_path)) == []
+
+
+def test_create_class_diagram_with_unhashable_class() -> None:
+    """Test that a class whose metaclass is not hashable is rendered."""
+    from umlizer.class_graph import create_class_diagram
+
+    class EqualityMeta(type):  # noqa: PLW1641
+        def __eq__(cls, other: object) -> bool:
+            return cls is other
+
+    class Unhashable(metaclass=EqualityMeta):
+        def run(self) -> None:
+            pass
+
+    class UnhashableChild(Unhashable):
+        pass
+
+    source = create_class_diagram([Unhashable, UnhashableChild]).source
+
+    assert '[label="{Unhashable|\\l|+ run()\\l}"]' in source
+    assert 'Unhashable" -> "' in source
+
+
+def test_search_modules(tmp_path, monkeypatch) -> None:
+    """Test pruning, hidden entries and unreadable directories."""
+    from umlizer.class_graph import _search_modules
+
+    for relative_path in (
+        'top.py',
+        'notes.txt',
+        'pkg/inner.py',
+        'pkg/__pycache__/inner.py',
+        '.hidden/secret.py',
+        'pkg/.hidden.py',
+        'locked/locked.py',
+    ):
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+
+    scandir = os.scandir
+    locked_dir = str(tmp_path / 'locked')
+
+    def _scandir(path: str) -> object:
+        if path == locked_dir:
+            raise PermissionError(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', _scandir)
+
+    assert sorted(_search_modules(str(tmp_path))) == [
+        str(tmp_path / 'pkg' / 'inner.py'),
+        str(tmp_path / 'top.py'),
+    ]